@@ -2,29 +2,142 @@
 import sys
 import os
 import uuid
+import hashlib
+import codecs
+import json
+import time
 import subprocess
 import traceback
+import functools
+import re
 
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
-    QComboBox, QPushButton, QSpinBox, QTextEdit, QMessageBox, QTabWidget
+    QComboBox, QPushButton, QSpinBox, QPlainTextEdit, QMessageBox, QTabWidget
+)
+from PyQt5.QtCore import (
+    QObject, QRunnable, QThreadPool, QSocketNotifier, QTimer, pyqtSignal
 )
-from PyQt5.QtCore import QThread, pyqtSignal
 
-import minecraft_launcher_lib as mll
+# minecraft_launcher_lib pulls in the whole networking stack, so it is
+# imported where it's used, after the window is already on screen
 
 # ---------- Helper: offline UUID ----------
-def generate_offline_uuid(username: str) -> str:
-    return str(uuid.uuid3(uuid.NAMESPACE_DNS, "OfflinePlayer:" + username))
+_NS_BYTES = uuid.NAMESPACE_DNS.bytes + b"OfflinePlayer:"
 
 
-# ---------- Worker thread ----------
-class MinecraftWorker(QThread):
+def generate_offline_uuid(username: str) -> str:
+    # Same result as uuid3(NAMESPACE_DNS, "OfflinePlayer:" + username)
+    h = bytearray(hashlib.md5(_NS_BYTES + username.encode("utf-8")).digest())
+    h[6] = (h[6] & 0x0F) | 0x30  # version 3
+    h[8] = (h[8] & 0x3F) | 0x80  # RFC 4122 variant
+    return str(uuid.UUID(bytes=bytes(h)))
+
+
+# ---------- Helper: Minecraft directory ----------
+@functools.lru_cache(maxsize=1)
+def _mc_dir():
+    import minecraft_launcher_lib as mll
+    return mll.utils.get_minecraft_directory()
+
+
+# ---------- Helper: installed loader version ----------
+@functools.lru_cache(maxsize=32)
+def _loader_pattern(prefix, suffix):
+    # Hyphens on both sides of the version, so "1.1" doesn't match "...-1.21.1"
+    return re.compile(re.escape(prefix) + "-.+-" + re.escape(suffix) + r"\Z", re.DOTALL)
+
+
+def _loader_version_key(name, prefix, suffix):
+    # Compare the loader part numerically so 0.15.0 sorts above 0.9.0
+    middle = name[len(prefix) + 1:len(name) - len(suffix) - 1]
+    return tuple(int(n) for n in re.findall(r"\d+", middle)), name
+
+
+def _find_loader_version(versions_dir, prefix, suffix):
+    match = _loader_pattern(prefix, suffix).match
+    try:
+        with os.scandir(versions_dir) as it:
+            return max(
+                (e.name for e in it
+                 if match(e.name) and e.is_dir(follow_symlinks=False)),
+                key=lambda name: _loader_version_key(name, prefix, suffix),
+                default=None
+            )
+    except FileNotFoundError:
+        return None
+
+
+# ---------- Helper: mods folder ----------
+@functools.lru_cache(maxsize=32)
+def resolve_mods_path(mc_dir, loader, version):
+    # Cleared by the launcher whenever it installs a loader
+    versions_dir = os.path.join(mc_dir, "versions")
+    folder = None
+    if loader == "Fabric":
+        folder = _find_loader_version(versions_dir, "fabric-loader", version)
+    elif loader == "Forge":
+        folder = _find_loader_version(versions_dir, "forge", version)
+    if folder:
+        return os.path.join(versions_dir, folder, "mods")
+    return os.path.join(mc_dir, "mods")
+
+
+# ---------- Helper: log decoding ----------
+# Game output is decoded a whole read at a time and sent to the UI as one
+# batch, the incremental decoder keeps characters split across reads intact
+def _new_log_decoder():
+    return codecs.getincrementaldecoder("utf-8")(errors="ignore")
+
+
+# Every separator str.splitlines() breaks on
+_LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+
+def _split_log_text(text):
+    # Returns (complete lines, unfinished tail to prepend to the next read)
+    lines = text.splitlines()
+    if not lines:
+        return lines, ""
+    last = text[-1]
+    if last == "\r":
+        # May be the first half of a "\r\n" split across reads
+        return lines, lines.pop() + "\r"
+    if last not in _LINE_BREAKS:
+        return lines, lines.pop()
+    return lines, ""
+
+
+# ---------- Worker ----------
+class _Signals(QObject):
     log = pyqtSignal(str)
     finished_signal = pyqtSignal()
+    # Emitted with the Popen object when the GUI thread takes over the log pipe
+    process_started = pyqtSignal(object)
+
+
+# Placeholders substituted into cached launch commands
+_CMD_USERNAME = "__LAUNCHER_USERNAME__"
+_CMD_UUID = "__LAUNCHER_UUID__"
+_CMD_WIDTH = "__LAUNCHER_WIDTH__"
+_CMD_HEIGHT = "__LAUNCHER_HEIGHT__"
+_CMD_PLACEHOLDERS = re.compile("|".join(
+    re.escape(p) for p in (_CMD_USERNAME, _CMD_UUID, _CMD_WIDTH, _CMD_HEIGHT)
+))
+
+
+# Marks a vanilla or Fabric version whose install ran to completion
+INSTALL_MARKER_NAME = ".launcher_installed"
+
+
+class MinecraftRunnable(QRunnable):
+    # (launcher_version, mc_dir, ram_mb) -> command with placeholders, cleared
+    # after every install since the Java path in it depends on install state
+    _cmd_cache = {}
 
     def __init__(self, username, version, ram_mb, loader, width, height):
         super().__init__()
+        self.signals = _Signals()
         self.username = username
         self.version = version
         self.ram_mb = ram_mb
@@ -32,62 +145,111 @@ class MinecraftWorker(QThread):
         self.width = width
         self.height = height
 
+    def _fill_command(self, template, user):
+        values = {
+            _CMD_USERNAME: user["username"],
+            _CMD_UUID: user["uuid"],
+            _CMD_WIDTH: str(self.width),
+            _CMD_HEIGHT: str(self.height),
+        }
+        # One pass per argument, so substituted values are never rescanned
+        def substitute(m):
+            return values[m.group(0)]
+        return [_CMD_PLACEHOLDERS.sub(substitute, arg) for arg in template]
+
+    def _pump_log(self, proc):
+        decoder = _new_log_decoder()
+        tail = ""
+        while True:
+            chunk = proc.stdout.read1(65536)
+            if not chunk:
+                break
+            lines, tail = _split_log_text(tail + decoder.decode(chunk))
+            if lines:
+                self.signals.log.emit("\n".join(lines))
+        tail = (tail + decoder.decode(b"", final=True)).rstrip()
+        if tail:
+            self.signals.log.emit(tail)
+        proc.stdout.close()
+        proc.wait()
+        self.signals.log.emit(f"Minecraft exited with code {proc.returncode}")
+
     def run(self):
+        handed_off = False
         try:
-            mc_dir = mll.utils.get_minecraft_directory()
+            import minecraft_launcher_lib as mll
+            mc_dir = _mc_dir()
             launcher_version = None
             mods_path = os.path.join(mc_dir, "mods")
 
             # ----------------- Loader Handling -----------------
             if self.loader == "Fabric":
                 try:
-                    self.log.emit(f"Installing Fabric for {self.version}...")
-                    # Install Fabric (latest loader)
-                    mll.fabric.install_fabric(self.version, mc_dir)
-                    # Detect the version folder
                     versions_dir = os.path.join(mc_dir, "versions")
-                    fabric_versions = [
-                        v for v in os.listdir(versions_dir)
-                        if v.startswith("fabric-loader") and v.endswith(self.version)
-                    ]
-                    if fabric_versions:
-                        launcher_version = fabric_versions[-1]
+                    launcher_version = _find_loader_version(versions_dir, "fabric-loader", self.version)
+                    # The folder exists before the loader libraries are downloaded,
+                    # so only a completed install (marker present) is reused
+                    if launcher_version and os.path.isfile(
+                            os.path.join(versions_dir, launcher_version, INSTALL_MARKER_NAME)):
+                        self.signals.log.emit(f"Fabric already installed: {launcher_version}")
+                    else:
+                        self.signals.log.emit(f"Installing Fabric for {self.version}...")
+                        # Install Fabric (latest loader), pinned so we know the folder name
+                        loader_ver = mll.fabric.get_latest_loader_version()
+                        mll.fabric.install_fabric(self.version, mc_dir, loader_version=loader_ver)
+                        launcher_version = f"fabric-loader-{loader_ver}-{self.version}"
+                        with open(os.path.join(versions_dir, launcher_version, INSTALL_MARKER_NAME),
+                                  "w", encoding="utf-8"):
+                            pass
+                        resolve_mods_path.cache_clear()
+                        self._cmd_cache.clear()
+                    if launcher_version:
                         mods_path = os.path.join(versions_dir, launcher_version, "mods")
                         os.makedirs(mods_path, exist_ok=True)
-                    else:
-                        launcher_version = None
-                    self.log.emit(f"Fabric installed: {launcher_version}")
+                    self.signals.log.emit(f"Fabric installed: {launcher_version}")
                 except Exception as e:
-                    self.log.emit(f"Fabric installation failed: {e}")
+                    self.signals.log.emit(f"Fabric installation failed: {e}")
                     return
 
             elif self.loader == "Forge":
                 try:
-                    self.log.emit(f"Installing Forge for {self.version}...")
+                    self.signals.log.emit(f"Installing Forge for {self.version}...")
                     # Use Forge helper
                     forge_versions = mll.forge.get_installed_forge_versions(mc_dir)
                     if not forge_versions:
                         mll.forge.install_forge_version(self.version, mc_dir)
                         forge_versions = mll.forge.get_installed_forge_versions(mc_dir)
+                        resolve_mods_path.cache_clear()
+                        self._cmd_cache.clear()
                     launcher_version = forge_versions[-1] if forge_versions else self.version
                     mods_path = os.path.join(mc_dir, "versions", launcher_version, "mods")
                     os.makedirs(mods_path, exist_ok=True)
-                    self.log.emit(f"Forge installed: {launcher_version}")
+                    self.signals.log.emit(f"Forge installed: {launcher_version}")
                 except Exception as e:
-                    self.log.emit(f"Forge installation failed: {e}")
+                    self.signals.log.emit(f"Forge installation failed: {e}")
                     return
             else:  # Vanilla
                 try:
-                    self.log.emit(f"Ensuring vanilla {self.version} is installed...")
-                    mll.install.install_minecraft_version(self.version, mc_dir)
+                    # Written only once install_minecraft_version returns, so an
+                    # interrupted install (e.g. before the Java runtime) is retried
+                    marker = os.path.join(mc_dir, "versions", self.version, INSTALL_MARKER_NAME)
+                    if os.path.isfile(marker):
+                        self.signals.log.emit("Vanilla already installed")
+                    else:
+                        self.signals.log.emit(f"Ensuring vanilla {self.version} is installed...")
+                        # Cleared up front, a failed install still changes what's on disk
+                        self._cmd_cache.clear()
+                        mll.install.install_minecraft_version(self.version, mc_dir)
+                        with open(marker, "w", encoding="utf-8"):
+                            pass
                     launcher_version = self.version
                 except Exception:
                     launcher_version = self.version
-                mods_path = os.path.join(mc_dir, "mods")
+                mods_path = resolve_mods_path(mc_dir, "Vanilla", self.version)
                 os.makedirs(mods_path, exist_ok=True)
 
             if not launcher_version:
-                self.log.emit("Error: launcher_version is None!")
+                self.signals.log.emit("Error: launcher_version is None!")
                 return
 
             # ----------------- Offline User -----------------
@@ -97,40 +259,144 @@ class MinecraftWorker(QThread):
                 "uuid": uuid_off,
                 "access_token": "null"
             }
-            self.log.emit(f"Using offline user: {self.username} ({uuid_off})")
-
-            # ----------------- Launch Options -----------------
-            options = {
-                "username": user["username"],
-                "uuid": user["uuid"],
-                "token": user["access_token"],
-                "jvmArguments": [f"-Xmx{self.ram_mb}M", f"-Xms{min(512, self.ram_mb)}M"],
-                "game_directory": mc_dir,
-                "gameArguments": [f"--width {self.width}", f"--height {self.height}"],
-                "mods_directory": mods_path
-            }
+            self.signals.log.emit(f"Using offline user: {self.username} ({uuid_off})")
+
+            # ----------------- Build Command -----------------
+            # Per-user fields are filled in by _fill_command, so the
+            # resolved command can be reused for the whole session
+            key = (launcher_version, mc_dir, self.ram_mb)
+            template = self._cmd_cache.get(key)
+            if template is None:
+                options = {
+                    "username": _CMD_USERNAME,
+                    "uuid": _CMD_UUID,
+                    "token": user["access_token"],
+                    "jvmArguments": [f"-Xmx{self.ram_mb}M", f"-Xms{min(512, self.ram_mb)}M"],
+                    "game_directory": mc_dir,
+                    "customResolution": True,
+                    "resolutionWidth": _CMD_WIDTH,
+                    "resolutionHeight": _CMD_HEIGHT,
+                    "mods_directory": mods_path
+                }
+                template = mll.command.get_minecraft_command(launcher_version, mc_dir, options)
+                self._cmd_cache[key] = template
+            cmd = self._fill_command(template, user)
+            self.signals.log.emit("Launching Minecraft...")
+
+            proc = subprocess.Popen(cmd, cwd=mc_dir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, bufsize=-1)
+            if sys.platform == "win32":
+                # QSocketNotifier can't watch pipes on Windows, read them here
+                self._pump_log(proc)
+            else:
+                handed_off = True
+                self.signals.process_started.emit(proc)
 
-            # ----------------- Build & Run Command -----------------
-            cmd = mll.command.get_minecraft_command(launcher_version, mc_dir, options)
-            self.log.emit("Launching Minecraft...")
+        except Exception:
+            self.signals.log.emit("Launcher crashed:\n" + traceback.format_exc())
+        finally:
+            if not handed_off:
+                self.signals.finished_signal.emit()
+
+
+# ---------- Log pump (GUI thread) ----------
+class _LogPump(QObject):
+    def __init__(self, proc, signals, parent=None):
+        super().__init__(parent)
+        self.proc = proc
+        self.signals = signals
+        self._decoder = _new_log_decoder()
+        self._tail = ""
+        self._fd = proc.stdout.fileno()
+        os.set_blocking(self._fd, False)
+        self.notifier = QSocketNotifier(self._fd, QSocketNotifier.Read, self)
+        self.notifier.activated.connect(self._on_ready)
+
+    def _on_ready(self):
+        try:
+            chunk = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            # An exception escaping this slot would abort the launcher
+            self.signals.log.emit(f"Reading game output failed: {e}")
+            chunk = b""
+        if not chunk:
+            self.notifier.setEnabled(False)
+            tail = (self._tail + self._decoder.decode(b"", final=True)).rstrip()
+            if tail:
+                self.signals.log.emit(tail)
+            self._finish()
+            return
+        lines, self._tail = _split_log_text(self._tail + self._decoder.decode(chunk))
+        if lines:
+            self.signals.log.emit("\n".join(lines))
+
+    def _finish(self):
+        # The pipe can close slightly before the process is reaped
+        if self.proc.poll() is None:
+            QTimer.singleShot(100, self._finish)
+            return
+        self.proc.stdout.close()
+        self.signals.log.emit(f"Minecraft exited with code {self.proc.returncode}")
+        self.signals.finished_signal.emit()
+        self.deleteLater()
 
-            proc = subprocess.Popen(cmd, cwd=mc_dir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, bufsize=1)
-            for raw in iter(proc.stdout.readline, b''):
-                if not raw:
-                    break
-                try:
-                    line = raw.decode("utf-8", errors="ignore").rstrip()
-                except Exception:
-                    line = str(raw)
-                self.log.emit(line)
-            proc.stdout.close()
-            proc.wait()
-            self.log.emit(f"Minecraft exited with code {proc.returncode}")
 
+# ---------- Version list fetcher ----------
+VERSION_CACHE_NAME = ".launcher_version_cache.json"
+VERSION_CACHE_TTL = 6 * 60 * 60  # seconds
+
+
+class _VersionSignals(QObject):
+    versions_ready = pyqtSignal(list)
+
+
+# Runs on the global pool rather than as a window-owned QThread, so closing
+# the window mid-request neither blocks nor tears down a running thread
+class VersionFetcher(QRunnable):
+    def __init__(self):
+        super().__init__()
+        self.signals = _VersionSignals()
+
+    def run(self):
+        import minecraft_launcher_lib as mll
+
+        cache = os.path.join(_mc_dir(), VERSION_CACHE_NAME)
+
+        # Fresh cache: skip the network entirely. A stale one is kept as a
+        # fallback in case the fetch below fails
+        cached = []
+        try:
+            fresh = time.time() - os.path.getmtime(cache) < VERSION_CACHE_TTL
+            with open(cache, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, list) and all(isinstance(v, str) for v in data):
+                cached = data
+            if fresh and cached:
+                self.signals.versions_ready.emit(cached)
+                return
+        except (OSError, ValueError):
+            pass
+
+        try:
+            versions = mll.utils.get_available_versions("release")
+            release_ids = [v["id"] for v in versions] if versions else []
         except Exception:
-            self.log.emit("Launcher crashed:\n" + traceback.format_exc())
-        finally:
-            self.finished_signal.emit()
+            release_ids = []
+
+        if not release_ids:
+            self.signals.versions_ready.emit(cached)
+            return
+
+        try:
+            os.makedirs(os.path.dirname(cache), exist_ok=True)
+            tmp = cache + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(release_ids, f)
+            os.replace(tmp, cache)
+        except OSError:
+            pass
+        self.signals.versions_ready.emit(release_ids)
 
 
 # ---------- Main UI ----------
@@ -201,8 +467,10 @@ class LauncherUI(QWidget):
         layout.addWidget(self.launch_btn)
 
         layout.addWidget(QLabel("Logs:"))
-        self.log_box = QTextEdit()
+        self.log_box = QPlainTextEdit()
         self.log_box.setReadOnly(True)
+        self.log_box.setMaximumBlockCount(5000)
+        self.log_box.setCenterOnScroll(False)
         layout.addWidget(self.log_box)
 
         self.main_tab.setLayout(layout)
@@ -220,55 +488,47 @@ class LauncherUI(QWidget):
         self.settings_tab.setLayout(layout)
 
     def open_mods_folder(self):
-        mc_dir = mll.utils.get_minecraft_directory()
+        mc_dir = _mc_dir()
         loader = self.loader_combo.currentText()
         version = self.version_combo.currentText()
 
-        mods_path = os.path.join(mc_dir, "mods")
-        if loader == "Fabric":
-            versions_dir = os.path.join(mc_dir, "versions")
-            fabric_versions = [
-                v for v in os.listdir(versions_dir)
-                if v.startswith("fabric-loader") and v.endswith(version)
-            ]
-            if fabric_versions:
-                mods_path = os.path.join(versions_dir, fabric_versions[-1], "mods")
-        elif loader == "Forge":
-            versions_dir = os.path.join(mc_dir, "versions")
-            forge_versions = [
-                v for v in os.listdir(versions_dir)
-                if v.startswith("forge") and v.endswith(version)
-            ]
-            if forge_versions:
-                mods_path = os.path.join(versions_dir, forge_versions[-1], "mods")
-
+        mods_path = resolve_mods_path(mc_dir, loader, version)
         os.makedirs(mods_path, exist_ok=True)
 
         if sys.platform == "win32":
             os.startfile(mods_path)
-        elif sys.platform == "darwin":
-            subprocess.Popen(["open", mods_path])
-        else:
-            subprocess.Popen(["xdg-open", mods_path])
+            return
+
+        opener = "open" if sys.platform == "darwin" else "xdg-open"
+        # Detach the helper so it doesn't hold our stdio or die with the launcher
+        subprocess.Popen(
+            [opener, mods_path],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True, close_fds=True
+        )
 
     # --- Populate versions ---
     def populate_versions(self):
+        # Show a default right away, the real list arrives from the fetcher
         self.version_combo.clear()
-        try:
-            versions = mll.utils.get_available_versions("release")
-            release_ids = [v["id"] for v in versions] if versions else []
-            if release_ids:
-                self.version_combo.addItems(release_ids)
-                idx = self.version_combo.findText("1.20.1")
-                if idx != -1:
-                    self.version_combo.setCurrentIndex(idx)
-            else:
-                self.version_combo.addItem("1.20.1")
-        except Exception:
-            self.version_combo.addItem("1.20.1")
+        self.version_combo.addItem("1.20.1")
+
+        self.version_fetcher = VersionFetcher()
+        self.version_fetcher.signals.versions_ready.connect(self.on_versions_ready)
+        QThreadPool.globalInstance().start(self.version_fetcher)
+
+    def on_versions_ready(self, release_ids):
+        if not release_ids:
+            return
+        current = self.version_combo.currentText()
+        self.version_combo.clear()
+        self.version_combo.addItems(release_ids)
+        idx = self.version_combo.findText(current)
+        if idx != -1:
+            self.version_combo.setCurrentIndex(idx)
 
     def log(self, text: str):
-        self.log_box.append(text)
+        self.log_box.appendPlainText(text)
 
     def on_launch(self):
         username = self.username_input.text().strip()
@@ -284,12 +544,16 @@ class LauncherUI(QWidget):
 
         self.log(f"Launching: {username} — {version} ({loader}) RAM={ram}MB")
 
-        self.worker = MinecraftWorker(username, version, ram, loader, width, height)
-        self.worker.log.connect(self.log)
-        self.worker.finished_signal.connect(lambda: self.log("Launch finished."))
+        self.worker = MinecraftRunnable(username, version, ram, loader, width, height)
+        self.worker.signals.log.connect(self.log)
+        self.worker.signals.finished_signal.connect(lambda: self.log("Launch finished."))
         self.launch_btn.setEnabled(False)
-        self.worker.finished_signal.connect(lambda: self.launch_btn.setEnabled(True))
-        self.worker.start()
+        self.worker.signals.finished_signal.connect(lambda: self.launch_btn.setEnabled(True))
+        self.worker.signals.process_started.connect(self.attach_log_pump)
+        QThreadPool.globalInstance().start(self.worker)
+
+    def attach_log_pump(self, proc):
+        self.log_pump = _LogPump(proc, self.worker.signals, self)
 
 
 # ---------- Run ----------